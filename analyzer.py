@@ -1,26 +1,43 @@
 from __future__ import annotations
 
+import bisect
 import json
 import os
+import pickle
+import random
 import sys
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Literal, Optional
+from typing import Callable, Literal, Optional
 
-import imagehash
+import numpy as np
 import pytesseract
 import requests
 from PIL import Image, ImageGrab, ImageOps
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Assuming these are correctly defined in models.py with the 'self' fix
 # and AnalysisReport is a simple data class for results.
-from models import AnalysisReport, DecodeResult, Pattern, Song, ArchiveException
+from models import (
+    AnalysisReport,
+    DecodeResult,
+    Difficulty,
+    Pattern,
+    Rank,
+    Song,
+    ArchiveException,
+)
 
 if getattr(sys, "frozen", False):
     BASEDIR = os.path.dirname(sys.executable)
 else:
     BASEDIR = os.path.dirname(os.path.abspath(__file__))
 os.environ["TESSDATA_PREFIX"] = os.path.join(BASEDIR, "tesseract", "tessdata")
+# OCR crops are tiny, so OpenMP thread startup costs more than it saves
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
 
 # --- CONFIGURATION CONSTANTS ---
 # Use one dictionary for all ROI ratios for better maintainability.
@@ -63,14 +80,252 @@ ROI_CONFIG = {
     },
 }
 
+# Notes count ROIs share the X range of "notes_area" and only store (y0, y1)
+NOTES_ROI_KEYS = (
+    "total_notes",
+    "perfect_high_y",
+    "perfect_y",
+    "great_y",
+    "good_y",
+    "miss_y",
+)
+
+
+def _roi_ratios(screen_config: dict[str, tuple[int, ...]]) -> dict[str, tuple]:
+    """Normalizes one screen's ROI_CONFIG entries to 1920x1080 ratios."""
+    notes_x0, _, notes_xf, _ = screen_config.get("notes_area", (0, 0, 0, 0))
+    ratios = {}
+    for key, coords in screen_config.items():
+        if key in NOTES_ROI_KEYS:
+            coords = (notes_x0, coords[0], notes_xf, coords[1])
+        ratios[key] = tuple(
+            value / (REF_W if i % 2 == 0 else REF_H) for i, value in enumerate(coords)
+        )
+    return ratios
+
+
+# Same layout as ROI_CONFIG, precomputed so cropping only has to scale
+ROI_RATIOS = {
+    screen_type: _roi_ratios(screen_config)
+    for screen_type, screen_config in ROI_CONFIG.items()
+}
+
+# Speed widget that only the select screen shows, used to tell screens apart
+SELECT_SPEED_ROI = (30, 908, 119, 932)
+
 # Use a dictionary for color templates for maintainability
 DIFFICULTY_COLORS = {
-    "EASY": (254, 179, 26),
-    "HARD": (252, 109, 111),
-    "OVER": (187, 99, 219),
-    "PLUS": (69, 81, 141),
+    Difficulty.EASY: (254, 179, 26),
+    Difficulty.HARD: (252, 109, 111),
+    Difficulty.OVER: (187, 99, 219),
+    Difficulty.PLUS: (69, 81, 141),
 }
 COLOR_TOLERANCE = 5  # Use a small tolerance for minor compression changes
+DIFFICULTY_NAMES = tuple(DIFFICULTY_COLORS)
+DIFFICULTY_COLOR_TABLE = np.array(list(DIFFICULTY_COLORS.values()), dtype=np.int16)
+
+# Colors of the select screen arrow that points at the chosen difficulty
+PIVOT_DIFFICULTIES = (
+    Difficulty.EASY,
+    Difficulty.HARD,
+    Difficulty.OVER,
+    Difficulty.PLUS,
+)
+PIVOT_COLORS = np.array(
+    [(231, 136, 40), (234, 98, 124), (146, 115, 254), (31, 45, 90)], dtype=np.int16
+)
+PIVOT_TOLERANCE = 4  # Max per-channel difference, inclusive
+MAX_PATCH_COLOR = np.array([(200, 111, 254)], dtype=np.int16)
+
+# Each OCR call is a tesseract subprocess, so independent ROIs can run side by side
+OCR_EXECUTOR = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+
+# Lowest judge rate for each rank above C, in ascending order
+RANK_THRESHOLDS = (70, 80, 90, 95, 97, 98, 99, 99.5, 99.8)
+RANK_LABELS = tuple(Rank)[1:]  # Every rank but F, which the judge can't tell
+# P.A.T.C.H. multiplier of each rank; F earns nothing
+RANK_RATIOS = {
+    Rank.F: 0.0,
+    Rank.C: 0.2,
+    Rank.B: 0.3,
+    Rank.A: 0.4,
+    Rank.A_PLUS: 0.5,
+    Rank.AA: 0.6,
+    Rank.AA_PLUS: 0.7,
+    Rank.S: 0.8,
+    Rank.S_PLUS: 0.9,
+    Rank.SS: 0.95,
+    Rank.SS_PLUS: 1,
+}
+
+# Song DB fetch retries: delay doubles from the initial value up to the cap (seconds)
+FETCH_MAX_ATTEMPTS = 8
+FETCH_INITIAL_DELAY = 0.25
+FETCH_MAX_DELAY = 8.0
+
+# Seconds a revalidated song DB cache is trusted without asking the server again
+SONG_DB_TTL = 300
+
+# Bump whenever Song or Pattern change shape, so stale pickled DBs are rebuilt
+SONG_CACHE_VERSION = 8
+
+# Lookup table for OCR binarization (white text on a dark background)
+BINARIZE_LUT = [255 if x > 200 else 0 for x in range(256)]
+
+# Tesseract configs, keyed by the kind of value being read
+OCR_CONFIGS = {
+    "judge": "--psm 7 -c tessedit_char_whitelist=0123456789.%",
+    "line": "--psm 7 -c tessedit_char_whitelist=46",
+    "integer": "--psm 7 --oem 1 -c tessedit_char_whitelist=0123456789",
+    "patch": "--psm 7 -c tessedit_char_whitelist=0123456789.",
+    "difficulty": "--psm 8 -c tessedit_char_whitelist=EASYHRDOVPLUS",
+}
+
+# pHash: the 8x8 low-frequency corner of the DCT-II of a 32x32 grayscale image,
+# thresholded at its median. Only those 8 rows of the DCT basis are ever needed.
+PHASH_SIZE, PHASH_IMG_SIZE = 8, 32
+PHASH_DCT_BASIS = 2 * np.cos(
+    np.pi
+    * np.outer(np.arange(PHASH_SIZE), 2 * np.arange(PHASH_IMG_SIZE) + 1)
+    / (2 * PHASH_IMG_SIZE)
+)
+
+# Reference pHashes of fixed UI elements
+SELECT_SPEED_HASH = int("c0c73d38273ed2c3", 16)
+SELECT_FULL_COMBO_HASH = int("8a82953d9d376b1a", 16)
+SELECT_F_RANK_HASH = int("bb604083cfda63a7", 16)
+RESULT_F_RANK_HASH = int("a3636e1f941a1736", 16)
+
+# Known pHashes of hard-to-OCR glyphs, decoded once at import time
+SELECT_LEVEL_PHASHES = {
+    level: int(phash, 16)
+    for level, phash in {
+        5: "ea66a51ad2696497",
+        7: "eb4ae42dc42eb196",
+        15: "e87c8d02d369c697",
+        19: "e87a8d09cd699297",
+        21: "f26aad11d327849d",
+    }.items()
+}
+SELECT_MAJOR_PATCH_PHASHES = {
+    patch: int(phash, 16)
+    for patch, phash in {
+        609: "f3738c6596f2218c",
+        610: "f3738e6696a3218c",
+        627: "e151ca6616e93b9c",
+        637: "e1518e6216e52f9e",
+        641: "f3f19a622c93698c",
+        642: "f371966a2ad2658c",
+        661: "e3619a63af61619c",
+        670: "f3698c662cb3338c",
+        671: "f3698c662cf3138c",
+        676: "f36b8c6405f2738c",
+    }.items()
+}
+SELECT_MINOR_PATCH_PHASHES = {
+    patch: int(phash, 16)
+    for patch, phash in {22: "ae78d02f0dac78d2", 88: "aa2ad5ad52cc2cd3"}.items()
+}
+SELECT_MINOR_JUDGE_PHASHES = {
+    judge: int(phash, 16)
+    for judge, phash in {5277: "9dc1aabc8183ec3b", 5572: "9be4e6ea9110ee13"}.items()
+}
+RESULT_LEVEL_PHASHES = {
+    level: int(phash, 16)
+    for level, phash in {
+        5: "ec6495db9b249293",
+        6: "eea5995a92ad9292",
+        8: "eead9552916d9292",
+        9: "ec32954d93b2926d",
+    }.items()
+}
+
+
+def match_colors(pixels: np.ndarray, colors: np.ndarray, tolerance: int) -> np.ndarray:
+    """Matches (N, 3+) pixels against (K, 3) colors in one vectorized pass.
+
+    Returns an (N, K) bool array, True where every RGB channel is within
+    `tolerance` of the color.
+    """
+    diffs = np.abs(pixels[:, None, :3].astype(np.int16) - colors[None, :, :])
+    return (diffs <= tolerance).all(axis=2)
+
+
+def fast_phash(img: Image.Image) -> int:
+    """Computes the 64-bit pHash of an image, packed into an int.
+
+    Produces the same bits as `imagehash.phash`, but only evaluates the 8x8
+    corner of the DCT it keeps instead of the full 32x32 transform.
+    """
+    pixels = np.asarray(
+        img.convert("L").resize(
+            (PHASH_IMG_SIZE, PHASH_IMG_SIZE), Image.Resampling.LANCZOS
+        ),
+        dtype=np.float64,
+    )
+    # Round away float noise so coefficients that are exactly zero for flat
+    # regions compare against the median the same way a full DCT would
+    low_freq = np.round(PHASH_DCT_BASIS @ pixels @ PHASH_DCT_BASIS.T, 6)
+    bits = np.packbits(low_freq > np.median(low_freq))
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def parse_ocr_int(text: str) -> Optional[int]:
+    """Parses an all-digit OCR string in one pass; None if it isn't one."""
+    value = 0
+    for char in text:
+        digit = ord(char) - 48  # ord("0")
+        if not 0 <= digit <= 9:
+            return None
+        value = value * 10 + digit
+    return value if text else None
+
+
+def parse_ocr_decimal(
+    text: str, implied_decimals: int = 0, ignore: str = ""
+) -> Optional[float]:
+    """Parses digits with at most one "." in one pass; None if malformed.
+
+    Characters in `ignore` are skipped. Without a ".", a number of at least
+    `implied_decimals` + 1 digits gets that many decimals (e.g. "279" -> 2.79).
+    """
+    value = 0
+    digits = 0
+    decimals = None
+    for char in text:
+        digit = ord(char) - 48  # ord("0")
+        if 0 <= digit <= 9:
+            value = value * 10 + digit
+            digits += 1
+            if decimals is not None:
+                decimals += 1
+        elif char == "." and decimals is None:
+            decimals = 0
+        elif char not in ignore:
+            return None
+    if digits == 0:
+        return None
+    if decimals is None:
+        decimals = implied_decimals if digits > implied_decimals else 0
+    # Integer true division is correctly rounded, so this equals float(text)
+    return value / 10**decimals
+
+
+def hash_distance(a: int, b: int) -> int:
+    """Hamming distance between two packed pHashes."""
+    return (a ^ b).bit_count()
+
+
+def hamming_argmin(catalog: np.ndarray, query: int) -> tuple[int, int]:
+    """Finds the packed pHash in a non-empty uint64 array closest to `query`.
+
+    Returns (index, distance), scanning the whole catalog at once: XOR, then
+    popcount over the unpacked bits.
+    """
+    xor = catalog ^ np.uint64(query)
+    distances = np.unpackbits(xor.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+    best_index = int(np.argmin(distances))
+    return best_index, int(distances[best_index])
 
 
 # --- CORE ANALYZER CLASS ---
@@ -85,20 +340,28 @@ class ScreenshotAnalyzer:
         tesseract_exe_path = os.path.join(BASEDIR, "tesseract", "tesseract.exe")
         pytesseract.pytesseract.tesseract_cmd = tesseract_exe_path
         self.song_db: dict[int, Song] = {song.id: song for song in song_database}
-        self.jacket_hash_map: dict[str, Song] = self._build_jacket_hash_map()
+        # Parallel columns: jacket pHash and the id of the song it belongs to
+        self._ref_hashes: np.ndarray
+        self._ref_ids: np.ndarray
+        self._ref_hashes, self._ref_ids = self._build_jacket_hash_map()
+        self._exact_matches: dict[int, int] = dict(
+            zip(self._ref_hashes.tolist(), self._ref_ids.tolist())
+        )
         self.PHASH_THRESHOLD = 5
 
     # --- Setup Methods ---
 
-    def _build_jacket_hash_map(self) -> dict[str, Song]:
-        """Creates a map of pHash strings to Song objects for quick lookup."""
+    def _build_jacket_hash_map(self) -> tuple[np.ndarray, np.ndarray]:
+        """Packs every jacket pHash into a uint64 array, parallel to song ids."""
         hash_map = {}
         for song in self.song_db.values():
             if song.phash:
-                hash_map[song.phash] = song
+                hash_map[song.phash_u64] = song.id
             if song.plus_phash:
-                hash_map[song.plus_phash] = song
-        return hash_map
+                hash_map[song.plus_phash_u64] = song.id
+        ref_hashes = np.fromiter(hash_map, dtype=np.uint64, count=len(hash_map))
+        ref_ids = np.fromiter(hash_map.values(), dtype=np.int32, count=len(hash_map))
+        return ref_hashes, ref_ids
 
     # --- Static Helper Methods ---
 
@@ -119,55 +382,58 @@ class ScreenshotAnalyzer:
 
     @staticmethod
     def determine_screen_type(screenshot: Image.Image) -> Literal["SELECT", "RESULT"]:
-        select_speed_start = (30, 908)
-        select_speed_end = (119, 932)
-        select_speed_crop = screenshot.crop(select_speed_start + select_speed_end)
-        select_speed_hash = imagehash.phash(select_speed_crop)
-        hashed_select_speed = "c0c73d38273ed2c3"
-        if select_speed_hash - imagehash.hex_to_hash(hashed_select_speed) < 5:
+        """Tells the screens apart by the speed widget only the select screen has."""
+        width, height = screenshot.size
+        x0, y0, xf, yf = SELECT_SPEED_ROI
+        # Crop before hashing: fast_phash converts only the small widget to L
+        select_speed_crop = screenshot.crop(
+            (
+                int(round(width * (x0 / REF_W))),
+                int(round(height * (y0 / REF_H))),
+                int(round(width * (xf / REF_W))),
+                int(round(height * (yf / REF_H))),
+            )
+        )
+        select_speed_hash = fast_phash(select_speed_crop)
+        if hash_distance(select_speed_hash, SELECT_SPEED_HASH) < 5:
             return "SELECT"
         else:
             return "RESULT"
 
     @staticmethod
     def read_selected_level_by_phash(img: Image.Image):
-        level_hash_map = {
-            5: "ea66a51ad2696497",
-            7: "eb4ae42dc42eb196",
-            15: "e87c8d02d369c697",
-            19: "e87a8d09cd699297",
-            21: "f26aad11d327849d",
-        }
-        phash = imagehash.phash(img)
-        print(phash)
-        for level, level_hash in level_hash_map.items():
-            level_hash = imagehash.hex_to_hash(level_hash)
-            if phash - level_hash < 3:
+        phash = fast_phash(img)
+        print(f"{phash:016x}")
+        for level, level_hash in SELECT_LEVEL_PHASHES.items():
+            if hash_distance(phash, level_hash) < 3:
                 return level
         return 0
 
     @staticmethod
-    def is_pivot_pixel(rgb: tuple[int, int, int]):
-        # easy
-        if abs(rgb[0] - 231) < 5 and abs(rgb[1] - 136) < 5 and abs(rgb[2] - 40) < 5:
-            return "EASY"
-        elif abs(rgb[0] - 234) < 5 and abs(rgb[1] - 98) < 5 and abs(rgb[2] - 124) < 5:
-            return "HARD"
-        elif abs(rgb[0] - 146) < 5 and abs(rgb[1] - 115) < 5 and abs(rgb[2] - 254) < 5:
-            return "OVER"
-        elif abs(rgb[0] - 31) < 5 and abs(rgb[1] - 45) < 5 and abs(rgb[2] - 90) < 5:
-            return "PLUS"
-        else:
+    def find_pivot(column: np.ndarray) -> Optional[tuple[int, str]]:
+        """Returns (row, difficulty) of the first pivot-colored pixel in a column."""
+        hits = match_colors(column, PIVOT_COLORS, PIVOT_TOLERANCE)
+        hit_rows = hits.any(axis=1)
+        if not hit_rows.any():
             return None
+        row = int(np.argmax(hit_rows))
+        return row, PIVOT_DIFFICULTIES[int(np.argmax(hits[row]))]
 
-    def _analyze_select_screen(self, img: Image.Image) -> AnalysisReport:
+    @staticmethod
+    def is_pivot_pixel(rgb: tuple[int, int, int]):
+        pivot = ScreenshotAnalyzer.find_pivot(np.array([rgb]))
+        return pivot[1] if pivot else None
+
+    def _analyze_select_screen(
+        self, img: Image.Image, pixels: np.ndarray
+    ) -> AnalysisReport:
         screen_type = "SELECT"
         # 1. Get Base Data (Jacket and Match Song)
         jacket_crop = self._crop_and_ocr(
             img, screen_type, "jacket", lambda x: x, no_preprocess=True
         )
         # jacket_crop.save("out.png")
-        jacket_hash = imagehash.phash(jacket_crop)
+        jacket_hash = fast_phash(jacket_crop)
         matched_song, match_distance = self.get_best_match_song(jacket_hash)
 
         if match_distance > 5:
@@ -176,100 +442,92 @@ class ScreenshotAnalyzer:
             )
 
         # 2. Extract Lines and Base Difficulty Color (if available on select screen)
-        line = self._crop_and_ocr(img, screen_type, "line", self.get_ocr_line)
-        score = self._crop_and_ocr(img, screen_type, "score", self.get_ocr_integer)
-        major_patch = self._crop_and_ocr(
-            img, screen_type, "major_patch", self.get_ocr_select_major_patch
-        )
-        minor_patch = self._crop_and_ocr(
-            img, screen_type, "minor_patch", self.get_ocr_select_minor_patch
+        ocr_results = self._run_ocr_jobs(
+            img,
+            screen_type,
+            [
+                ("line", self.get_ocr_line, {}),
+                ("score", self.get_ocr_integer, {}),
+                ("major_patch", self.get_ocr_select_major_patch, {}),
+                ("minor_patch", self.get_ocr_select_minor_patch, {}),
+                ("major_judge", self.get_ocr_integer, {}),
+                ("minor_judge", self.get_ocr_select_minor_judge, {}),
+            ],
         )
-        if minor_patch < 10:
-            minor_patch = f"0{minor_patch}"
-        patch = float(f"{major_patch}.{minor_patch}")
+        line = ocr_results["line"]
+        score = ocr_results["score"]
+        major_patch = ocr_results["major_patch"]
+        minor_patch = ocr_results["minor_patch"]
+        # round() lands on the same float as parsing "major.minor" would
+        patch = round(major_patch + minor_patch / 100, 2)
 
-        major_judge = self._crop_and_ocr(
-            img, screen_type, "major_judge", self.get_ocr_integer
-        )
-        minor_judge = self._crop_and_ocr(
-            img, screen_type, "minor_judge", self.get_ocr_select_minor_judge
-        )
-        minor_judge = "0" * (4 - len(str(minor_judge))) + str(minor_judge)
-        judge = float(f"{major_judge}.{minor_judge}")
+        major_judge = ocr_results["major_judge"]
+        minor_judge = ocr_results["minor_judge"]
+        judge = round(major_judge + minor_judge / 10000, 4)
 
         is_full_combo = False
         is_perfect_decode = False
         is_max_patch = False
 
-        # Iterate until it founds the arrow
+        # Scan the column below the jacket for the arrow in one pass
         pivot_x = 843
-        pivot_y = 627
-        pivot_found = False
-        while pivot_y < 1040:
-            abs_coords = self._get_abs_coords(
-                (pivot_x, pivot_y, pivot_x, pivot_y), img.size
+        pivot_ys = np.arange(627, 1040)
+        abs_pivot_x = int(round(img.width * (pivot_x / REF_W)))
+        abs_pivot_ys = np.rint(img.height * (pivot_ys / REF_H)).astype(np.intp)
+        pivot = self.find_pivot(pixels[abs_pivot_ys, abs_pivot_x])
+        pivot_found = pivot is not None
+        if pivot_found:
+            pivot_y = int(pivot_ys[pivot[0]])
+            difficulty = pivot[1]
+            level_start_x = pivot_x - 105
+            level_start_y = pivot_y + 29
+            level_end_x = pivot_x
+            level_end_y = pivot_y + 95
+            level_abs_coords = self._get_abs_coords(
+                (level_start_x, level_start_y, level_end_x, level_end_y), img.size
             )
-            pivot_pixel = img.getpixel((abs_coords[0], abs_coords[1]))
-            difficulty = self.is_pivot_pixel(pivot_pixel)
-            if difficulty:
-                pivot_found = True
-                level_start_x = pivot_x
-                if difficulty == "UNKNOWN":
-                    difficulty = "PLUS"
-                level_start_x = pivot_x - 105
-                level_start_y = pivot_y + 29
-                level_end_x = pivot_x
-                level_end_y = pivot_y + 95
-                level_abs_coords = self._get_abs_coords(
-                    (level_start_x, level_start_y, level_end_x, level_end_y), img.size
-                )
-                level_crop = img.crop(level_abs_coords)
-                level_crop = self.ocr_preprocess(level_crop, do_invert=True)
-                # level_crop.show()
-                level = self.get_ocr_integer(level_crop)
-                print(f"OCRed Level: {level}")
-                available_levels = matched_song.get_available_levels(line, difficulty)
-                if len(available_levels) == 1:
-                    level = available_levels[0]
-                if not level in available_levels:
-                    level = self.read_selected_level_by_phash(level_crop)
-                break
-            pivot_y += 1
+            level_crop = img.crop(level_abs_coords)
+            level_crop = self.ocr_preprocess(level_crop, do_invert=True)
+            # level_crop.show()
+            level = self.get_ocr_integer(level_crop)
+            print(f"OCRed Level: {level}")
+            available_levels = matched_song.get_available_levels(line, difficulty)
+            if len(available_levels) == 1:
+                level = available_levels[0]
+            if not level in available_levels:
+                level = self.read_selected_level_by_phash(level_crop)
 
         if not pivot_found:
             print("Pivot not found")
 
-        full_combo_crop = self._crop_and_ocr(
-            img, screen_type, "full_combo", lambda x: x, no_preprocess=True
-        )
-        hashed_full_combo = imagehash.hex_to_hash("8a82953d9d376b1a")
-        # full_combo_crop.show()
-        full_combo_hash = imagehash.phash(full_combo_crop)
-        if full_combo_hash - hashed_full_combo < 5:
-            is_full_combo = True
-
         if judge == 100:
+            # A perfect decode is always a full combo, no need to hash the badge
             is_full_combo = True
             is_perfect_decode = True
-
-        max_patch_pixel = img.getpixel(ROI_CONFIG[screen_type]["max_patch"])
-        if (
-            abs(max_patch_pixel[0] - 200) < 5
-            and abs(max_patch_pixel[1] - 111) < 5
-            and abs(max_patch_pixel[2] - 254) < 5
-        ):
+        else:
+            full_combo_crop = self._crop_and_ocr(
+                img, screen_type, "full_combo", lambda x: x, no_preprocess=True
+            )
+            # full_combo_crop.show()
+            full_combo_hash = fast_phash(full_combo_crop)
+            if hash_distance(full_combo_hash, SELECT_FULL_COMBO_HASH) < 5:
+                is_full_combo = True
+
+        max_patch_x, max_patch_y = ROI_CONFIG[screen_type]["max_patch"]
+        max_patch_pixel = pixels[max_patch_y, max_patch_x : max_patch_x + 1]
+        if match_colors(max_patch_pixel, MAX_PATCH_COLOR, PIVOT_TOLERANCE).any():
             is_max_patch = True
 
-        rank_crop = self._crop_and_ocr(
-            img, screen_type, "rank", lambda x: x, no_preprocess=True
-        )
-        # rank_crop.show()
-        rank_hash = imagehash.phash(rank_crop)
-        hashed_f_rank = imagehash.hex_to_hash("bb604083cfda63a7")
-
         rank = self.calculate_rank(judge)
-        if rank_hash - hashed_f_rank < 5:
-            rank = "F"
+        # Only a failed play shows F, and a perfect decode can't fail
+        if not is_perfect_decode:
+            rank_crop = self._crop_and_ocr(
+                img, screen_type, "rank", lambda x: x, no_preprocess=True
+            )
+            # rank_crop.show()
+            rank_hash = fast_phash(rank_crop)
+            if hash_distance(rank_hash, SELECT_F_RANK_HASH) < 5:
+                rank = Rank.F
         # 4. Return Report (Use N/A for missing result screen stats)
         return AnalysisReport(
             matched_song,
@@ -299,35 +557,17 @@ class ScreenshotAnalyzer:
         **kwargs,
     ):
         """Helper to handle scaling, cropping, and running OCR."""
-        size = img.size
-        ref_coords = ROI_CONFIG[screen_type][config_key]
+        width, height = img.size
+        ratios = ROI_RATIOS[screen_type][config_key]
         if is_point:
-            rx, ry = self._ratio(ref_coords[0], ref_coords[1])
-            abs_x, abs_y = self._scale_coordinate(rx, ry, size)
+            abs_x = int(round(width * ratios[0]))
+            abs_y = int(round(height * ratios[1]))
             return ocr_func(img, abs_x, abs_y, **kwargs)  # Call color/point function
 
-        # Handle notes area with common X but separate Y
-        elif config_key in [
-            "perfect_high_y",
-            "perfect_y",
-            "great_y",
-            "good_y",
-            "miss_y",
-            "total_notes",
-        ]:
-            notes_x = ROI_CONFIG[screen_type]["notes_area"]
-            rx0, rxf = self._ratio(notes_x[0], 0)[0], self._ratio(notes_x[2], 0)[0]
-            ry0, ryf = (
-                self._ratio(0, ref_coords[0])[1],
-                self._ratio(0, ref_coords[1])[1],
-            )
-        else:
-            # Bounding box logic
-            rx0, ry0 = self._ratio(ref_coords[0], ref_coords[1])
-            rxf, ryf = self._ratio(ref_coords[2], ref_coords[3])
-
-        abs_x0, abs_y0 = self._scale_coordinate(rx0, ry0, size)
-        abs_xf, abs_yf = self._scale_coordinate(rxf, ryf, size)
+        abs_x0 = int(round(width * ratios[0]))
+        abs_y0 = int(round(height * ratios[1]))
+        abs_xf = int(round(width * ratios[2]))
+        abs_yf = int(round(height * ratios[3]))
 
         crop = img.crop((abs_x0, abs_y0, abs_xf, abs_yf))
         if no_preprocess:
@@ -336,158 +576,116 @@ class ScreenshotAnalyzer:
         crop = self.ocr_preprocess(crop, **kwargs)
         return ocr_func(crop, **kwargs)
 
+    def _run_ocr_jobs(
+        self,
+        img: Image.Image,
+        screen_type: Literal["SELECT", "RESULT"],
+        jobs: list[tuple[str, Callable, dict]],
+    ) -> dict:
+        """Runs independent `_crop_and_ocr` jobs concurrently, keyed by ROI."""
+        futures = {
+            config_key: OCR_EXECUTOR.submit(
+                self._crop_and_ocr, img, screen_type, config_key, ocr_func, **kwargs
+            )
+            for config_key, ocr_func, kwargs in jobs
+        }
+        return {config_key: future.result() for config_key, future in futures.items()}
+
     # --- OCR / Matching Functions (Moved from global scope) ---
 
-    def get_best_match_song(
-        self, target_hash: imagehash.ImageHash
-    ) -> tuple[Optional[Song], int]:
+    def get_best_match_song(self, target_hash: int) -> tuple[Optional[Song], int]:
         """Finds the Song object corresponding to the target pHash."""
-        min_distance = float("inf")
-        best_match_song = None
+        # Unchanged jackets usually hash identically, so try an exact hit first
+        exact_id = self._exact_matches.get(target_hash)
+        if exact_id is not None:
+            return self.song_db[exact_id], 0
+        if not len(self._ref_ids):
+            return None, float("inf")
+
+        best_index, distance = hamming_argmin(self._ref_hashes, target_hash)
+        # Only the winning row needs its full Song object
+        song_id = int(self._ref_ids[best_index])
+        return self.song_db[song_id], distance
 
-        for phash_str, song_obj in self.jacket_hash_map.items():
-            # Tesseract 5 hash format is used for consistency
-            ref_hash = imagehash.hex_to_hash(phash_str)
-            distance = target_hash - ref_hash
+    @staticmethod
+    def ocr_text(img_crop: Image.Image, kind: str) -> str:
+        """Runs Tesseract on a crop with the prebuilt config for the given kind."""
+        return pytesseract.image_to_string(img_crop, config=OCR_CONFIGS[kind]).strip()
 
-            if distance < min_distance:
-                min_distance = distance
-                best_match_song = song_obj
-        return best_match_song, min_distance
+    @staticmethod
+    def match_known_phash(
+        img_crop: Image.Image, phash_map: dict[int, int], label: str
+    ) -> int:
+        """Reads a known value by pHash, falling back to integer OCR."""
+        text = ScreenshotAnalyzer.ocr_text(img_crop, "integer")
+        phash = fast_phash(img_crop)
+        print(f"{label} PHash: {phash:016x}")
+        lowest_distance = 50
+        possible_value = 0
+        for value, known_phash in phash_map.items():
+            distance = hash_distance(phash, known_phash)
+            if distance < lowest_distance:
+                lowest_distance = distance
+                possible_value = value
+        if lowest_distance < 3:
+            return possible_value
+        value = parse_ocr_int(text)
+        return value if value is not None else 0
 
     @staticmethod
     def get_ocr_judge(img_crop: Image.Image) -> float:
         """OCR for judge percentage (e.g., 99.0000%)."""
-        # Fix: Char whitelist spelling
-        ocr_config = r"--psm 7 -c tessedit_char_whitelist=0123456789.%"
-        text = pytesseract.image_to_string(img_crop, config=ocr_config).strip()
-
-        # Cleanup and convert to float
-        text = text.replace("%", "")
-        try:
-            return float(text)
-        except ValueError:
-            return 0.0
+        text = ScreenshotAnalyzer.ocr_text(img_crop, "judge")
+        value = parse_ocr_decimal(text, ignore="%")
+        return value if value is not None else 0.0
 
     @staticmethod
     def get_ocr_line(img_crop: Image.Image) -> int:
         """OCR for line count (4, 6). If no text, assume 6."""
-        # Whitelist 4, 6, and 8
-        ocr_config = r"--psm 7 -c tessedit_char_whitelist=46"
-        text = pytesseract.image_to_string(img_crop, config=ocr_config).strip()
+        text = ScreenshotAnalyzer.ocr_text(img_crop, "line")
 
         # Fallback logic: if OCR is empty, assume 6 (a common game logic)
-        try:
-            return int(text)
-        except ValueError:
-            return 6
+        value = parse_ocr_int(text)
+        return value if value is not None else 6
 
     @staticmethod
     def get_ocr_integer(img_crop: Image.Image, **kwargs) -> int:
         """OCR for pure integer values (Level, Score, Notes)."""
-        config = "--psm 7 --oem 1 -c tessedit_char_whitelist=0123456789"
-        text = pytesseract.image_to_string(img_crop, config=config).strip()
-        try:
-            return int(text)
-        except ValueError:
-            level_img_phash = imagehash.phash(img_crop)
+        text = ScreenshotAnalyzer.ocr_text(img_crop, "integer")
+        value = parse_ocr_int(text)
+        if value is None:
+            level_img_phash = fast_phash(img_crop)
             print(f"Error when converting the text to str: '{text}'")
-            print(f"Read pHash: {level_img_phash}")
+            print(f"Read pHash: {level_img_phash:016x}")
             print(f"Trying to read it by pHash...")
             return ScreenshotAnalyzer.find_level_phash(img_crop)
+        return value
 
     @staticmethod
     def get_ocr_select_major_patch(img_crop: Image.Image, **kwargs) -> int:
-        config = "--psm 7 --oem 1 -c tessedit_char_whitelist=0123456789"
-        text = pytesseract.image_to_string(img_crop, config=config).strip()
-        phash = imagehash.phash(img_crop)
-        print(f"Major Patch PHash: {phash}")
-        phash_map = {
-            609: "f3738c6596f2218c",
-            610: "f3738e6696a3218c",
-            627: "e151ca6616e93b9c",
-            637: "e1518e6216e52f9e",
-            641: "f3f19a622c93698c",
-            642: "f371966a2ad2658c",
-            661: "e3619a63af61619c",
-            670: "f3698c662cb3338c",
-            671: "f3698c662cf3138c",
-            676: "f36b8c6405f2738c",
-        }
-        lowest_distance = 50
-        possible_patch = ""
-        for patch, known_phash in phash_map.items():
-            known_phash = imagehash.hex_to_hash(known_phash)
-            distance = phash - known_phash
-            if distance < lowest_distance:
-                lowest_distance = distance
-                possible_patch = patch
-        if lowest_distance < 3:
-            return possible_patch
-        try:
-            return int(text)
-        except ValueError:
-            return 0
+        return ScreenshotAnalyzer.match_known_phash(
+            img_crop, SELECT_MAJOR_PATCH_PHASHES, "Major Patch"
+        )
 
     @staticmethod
     def get_ocr_select_minor_patch(img_crop: Image.Image, **kwargs) -> int:
-        config = "--psm 7 --oem 1 -c tessedit_char_whitelist=0123456789"
-        text = pytesseract.image_to_string(img_crop, config=config).strip()
-        phash = imagehash.phash(img_crop)
-        print(f"Minor Patch PHash: {phash}")
-        phash_map = {22: "ae78d02f0dac78d2", 88: "aa2ad5ad52cc2cd3"}
-        lowest_distance = 50
-        possible_patch = ""
-        for patch, known_phash in phash_map.items():
-            known_phash = imagehash.hex_to_hash(known_phash)
-            distance = phash - known_phash
-            if distance < lowest_distance:
-                lowest_distance = distance
-                possible_patch = patch
-        if lowest_distance < 3:
-            return possible_patch
-        try:
-            return int(text)
-        except ValueError:
-            return 0
+        return ScreenshotAnalyzer.match_known_phash(
+            img_crop, SELECT_MINOR_PATCH_PHASHES, "Minor Patch"
+        )
 
     @staticmethod
     def get_ocr_select_minor_judge(img_crop: Image.Image, **kwargs) -> int:
-        config = "--psm 7 --oem 1 -c tessedit_char_whitelist=0123456789"
-        text = pytesseract.image_to_string(img_crop, config=config).strip()
-        phash = imagehash.phash(img_crop)
-        print(f"Minor Judge PHash: {phash}")
-        phash_map = {5277: "9dc1aabc8183ec3b", 5572: "9be4e6ea9110ee13"}
-        lowest_distance = 50
-        possible_patch = ""
-        for patch, known_phash in phash_map.items():
-            known_phash = imagehash.hex_to_hash(known_phash)
-            distance = phash - known_phash
-            if distance < lowest_distance:
-                lowest_distance = distance
-                possible_patch = patch
-        if lowest_distance < 3:
-            return possible_patch
-        try:
-            return int(text)
-        except ValueError:
-            return 0
+        return ScreenshotAnalyzer.match_known_phash(
+            img_crop, SELECT_MINOR_JUDGE_PHASHES, "Minor Judge"
+        )
 
     @staticmethod
     def get_ocr_patch(img_crop: Image.Image, **kwargs) -> float:
         """OCR for patch value (e.g., 2.79)."""
-        config = "--psm 7 -c tessedit_char_whitelist=0123456789."
-        text = pytesseract.image_to_string(img_crop, config=config).strip()
-
-        # Post-processing fix for patch if the decimal is missed
-        if not "." in text and len(text) >= 3:
-            text = text[: len(text) - 2] + "." + text[-2:]
-        # print(f"OCR PATCH: '{text}'")
-
-        try:
-            return float(text)
-        except ValueError:
-            return 0.0
+        text = ScreenshotAnalyzer.ocr_text(img_crop, "patch")
+        # Patch always has 2 decimals, so restore the point if OCR missed it
+        value = parse_ocr_decimal(text, implied_decimals=2)
+        return value if value is not None else 0.0
 
     def _get_abs_coords(self, coords: tuple[int, int, int, int], size: tuple[int, int]):
         rx1, ry1 = self._ratio(coords[0], coords[1])
@@ -500,18 +698,17 @@ class ScreenshotAnalyzer:
     def get_ocr_difficulty_text(
         img_crop: Image.Image,
     ) -> Literal["EASY", "HARD", "OVER", "PLUS"]:
-        config = "--psm 8 -c tessedit_char_whitelist=EASYHRDOVPLUS"
-        return pytesseract.image_to_string(img_crop, config=config)
+        return ScreenshotAnalyzer.ocr_text(img_crop, "difficulty")
 
     @staticmethod
-    def get_difficulty(r: int, g: int, b: int) -> str:
+    def get_difficulty(r: int, g: int, b: int) -> Difficulty | str:
         """Identifies difficulty based on RGB color match."""
-        target_rgb = (r, g, b)
-        for difficulty, color in DIFFICULTY_COLORS.items():
-            # Simple tolerance check for each channel
-            if all(abs(target_rgb[i] - color[i]) <= COLOR_TOLERANCE for i in range(3)):
-                return difficulty
-        return "UNKNOWN"
+        hits = match_colors(
+            np.array([(r, g, b)]), DIFFICULTY_COLOR_TABLE, COLOR_TOLERANCE
+        )
+        if not hits.any():
+            return "UNKNOWN"
+        return DIFFICULTY_NAMES[int(np.argmax(hits[0]))]
 
     @staticmethod
     def calculate_judge_rate(ph: int, p: int, g: int, d: int, m: int) -> float:
@@ -528,54 +725,19 @@ class ScreenshotAnalyzer:
         return 200 * perfect_high + 150 * perfect + 100 * great
 
     @staticmethod
-    def calculate_rank(judge_rate: float) -> str:
+    def calculate_rank(judge_rate: float) -> Rank:
         """Calculates rank based on judge rate."""
-        if judge_rate >= 99.8:
-            return "SS+"
-        elif judge_rate >= 99.5:
-            return "SS"
-        elif judge_rate >= 99:
-            return "S+"
-        elif judge_rate >= 98:
-            return "S"
-        elif judge_rate >= 97:
-            return "AA+"
-        elif judge_rate >= 95:
-            return "AA"
-        elif judge_rate >= 90:
-            return "A+"
-        elif judge_rate >= 80:
-            return "A"
-        elif judge_rate >= 70:
-            return "B"
-        else:
-            return "C"
+        return RANK_LABELS[bisect.bisect_right(RANK_THRESHOLDS, judge_rate)]
 
     @staticmethod
     def calculate_patch(
         level: int,
-        rank: str,
+        rank: Rank,
         is_plus: bool,
         judge: float,
     ) -> float:
         """Calculates the P.A.T.C.H. value."""
-        rank_ratio = {
-            "C": 0.2,
-            "B": 0.3,
-            "A": 0.4,
-            "A+": 0.5,
-            "AA": 0.6,
-            "AA+": 0.7,
-            "S": 0.8,
-            "S+": 0.9,
-            "SS": 0.95,
-            "SS+": 1,
-        }
-
-        if rank == "F":
-            return 0.0  # Handle case not in rank_ratio
-
-        patch_base = level * 42 * (judge / 100) * rank_ratio[rank]
+        patch_base = level * 42 * (judge / 100) * RANK_RATIOS[rank]
         if is_plus:
             patch_base *= 1.02
 
@@ -603,11 +765,12 @@ class ScreenshotAnalyzer:
     @staticmethod
     def ocr_preprocess(img: Image.Image, do_invert: bool = False):
         """Do some preprocess (upscaling, binarization) for the best OCR result"""
+        # Upscale in colour first: resizing a grayscale crop shifts glyph edges
         resized_img = img.resize(
             (img.width * 4, img.height * 4), Image.Resampling.LANCZOS
         )
         grayscale_img = resized_img.convert("L")
-        bw_img = grayscale_img.point(lambda x: 255 if x > 200 else 0, "1")
+        bw_img = grayscale_img.point(BINARIZE_LUT, "1")
 
         if do_invert:
             bw_img = ImageOps.invert(bw_img)
@@ -616,18 +779,11 @@ class ScreenshotAnalyzer:
 
     @staticmethod
     def find_level_phash(img: Image.Image):
-        given_hash = imagehash.phash(img)
-        level_hash_map = {
-            5: "ec6495db9b249293",
-            6: "eea5995a92ad9292",
-            8: "eead9552916d9292",
-            9: "ec32954d93b2926d",
-        }
+        given_hash = fast_phash(img)
         closest_level = 0
         closest_distance = float("inf")
-        for level, compare_hash in level_hash_map.items():
-            compare_hash = imagehash.hex_to_hash(compare_hash)
-            distance = compare_hash - given_hash
+        for level, compare_hash in RESULT_LEVEL_PHASHES.items():
+            distance = hash_distance(compare_hash, given_hash)
             if distance < closest_distance:
                 closest_distance = distance
                 closest_level = level
@@ -650,17 +806,21 @@ class ScreenshotAnalyzer:
             print("Error: Clipboard is empty or does not contain an image.")
             # Return an empty report to prevent the crash
             return AnalysisReport(song_name="NO IMAGE")
+        # Decode once as RGB: the OCR workers crop this image concurrently and
+        # single-pixel probes read straight from its array view
+        img = img.convert("RGB")
+        pixels = np.asarray(img)
 
         screen_type = self.determine_screen_type(img)
 
         if screen_type == "SELECT":
-            return self._analyze_select_screen(img)
+            return self._analyze_select_screen(img, pixels)
 
         # --- 1. jacket and Song Match ---
         jacket_crop = self._crop_and_ocr(
             img, screen_type, "jacket", lambda x: x, no_preprocess=True
         )  # Pass crop back as PIL Image
-        jacket_hash = imagehash.phash(jacket_crop)
+        jacket_hash = fast_phash(jacket_crop)
         matched_song, match_distance = self.get_best_match_song(jacket_hash)
         if match_distance > 5:
             raise ArchiveException(
@@ -669,42 +829,47 @@ class ScreenshotAnalyzer:
 
         # --- 2. OCR Extraction ---
 
-        lines = self._crop_and_ocr(img, screen_type, "line", self.get_ocr_line)
-        level_ocr = self._crop_and_ocr(
-            img, screen_type, "level", self.get_ocr_integer, do_invert=True
-        )
-        patch_ocr = self._crop_and_ocr(
-            img, screen_type, "patch", self.get_ocr_patch, do_invert=True
-        )
-        score_ocr = self._crop_and_ocr(img, screen_type, "score", self.get_ocr_integer)
-        total_notes = self._crop_and_ocr(
-            img, screen_type, "total_notes", self.get_ocr_integer
-        )
-        perfect_high = self._crop_and_ocr(
-            img, screen_type, "perfect_high_y", self.get_ocr_integer
-        )
-        perfect = self._crop_and_ocr(
-            img, screen_type, "perfect_y", self.get_ocr_integer
+        ocr_results = self._run_ocr_jobs(
+            img,
+            screen_type,
+            [
+                ("line", self.get_ocr_line, {}),
+                ("level", self.get_ocr_integer, {"do_invert": True}),
+                ("patch", self.get_ocr_patch, {"do_invert": True}),
+                ("score", self.get_ocr_integer, {}),
+                ("total_notes", self.get_ocr_integer, {}),
+                ("perfect_high_y", self.get_ocr_integer, {}),
+                ("perfect_y", self.get_ocr_integer, {}),
+                ("great_y", self.get_ocr_integer, {}),
+                ("good_y", self.get_ocr_integer, {}),
+                ("miss_y", self.get_ocr_integer, {}),
+            ],
         )
-        great = self._crop_and_ocr(img, screen_type, "great_y", self.get_ocr_integer)
-        good = self._crop_and_ocr(img, screen_type, "good_y", self.get_ocr_integer)
-        miss = self._crop_and_ocr(img, screen_type, "miss_y", self.get_ocr_integer)
+        lines = ocr_results["line"]
+        level_ocr = ocr_results["level"]
+        patch_ocr = ocr_results["patch"]
+        score_ocr = ocr_results["score"]
+        total_notes = ocr_results["total_notes"]
+        perfect_high = ocr_results["perfect_high_y"]
+        perfect = ocr_results["perfect_y"]
+        great = ocr_results["great_y"]
+        good = ocr_results["good_y"]
+        miss = ocr_results["miss_y"]
         rank_crop = self._crop_and_ocr(
             img, screen_type, "rank", lambda x: x, no_preprocess=True
         )
-        rank_hash = imagehash.phash(rank_crop)
+        rank_hash = fast_phash(rank_crop)
         perfect_high, perfect, great, good, miss = self.verify_notes_count(
             total_notes, perfect_high, perfect, great, good, miss
         )
 
         # --- 3. Difficulty Color Check ---
-        r, g, b = img.getpixel(
-            self._scale_coordinate(
-                *self._ratio(*ROI_CONFIG[screen_type]["difficulty_color"]), img.size
-            )
+        color_x, color_y = self._scale_coordinate(
+            *self._ratio(*ROI_CONFIG[screen_type]["difficulty_color"]), img.size
         )
+        r, g, b = pixels[color_y, color_x].tolist()
         difficulty_str = self.get_difficulty(r, g, b)
-        is_plus_difficulty = difficulty_str == "PLUS"
+        is_plus_difficulty = difficulty_str is Difficulty.PLUS
 
         # --- 4. Calculation ---
         calculated_judge_rate = self.calculate_judge_rate(
@@ -713,9 +878,8 @@ class ScreenshotAnalyzer:
         calculated_score = self.calculate_score(perfect_high, perfect, great)
         calculated_rank = self.calculate_rank(calculated_judge_rate)
         # Try to find out if rank is F (bc F cannot be calculated...)
-        F_RANK_HASH = imagehash.hex_to_hash("a3636e1f941a1736")
-        if F_RANK_HASH - rank_hash < 5:
-            calculated_rank = "F"
+        if hash_distance(RESULT_F_RANK_HASH, rank_hash) < 5:
+            calculated_rank = Rank.F
 
         level_int = level_ocr
         calculated_patch = self.calculate_patch(
@@ -763,33 +927,39 @@ class ScreenshotAnalyzer:
 
 # --- INITIALIZATION AND EXECUTION ---
 
+# Every endpoint lives on one host, so share a pooled keep-alive session
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=10,
+        max_retries=Retry(total=3, backoff_factor=0.5),
+    ),
+)
+
 
 def version_to_string(version: tuple[int, int, int]):
     return f"v{version[0]}.{version[1]}.{version[2]}"
 
 
-def fetch_archive(b64_api_key: str) -> dict[str, DecodeResult]:
+def fetch_archive(b64_api_key: str) -> dict[tuple, DecodeResult]:
     archive_endpoint = "https://www.platina-archive.app/api/v2/get_archive"
     headers = {"X-API-Key": b64_api_key, "Content-Type": "application/json"}
     try:
-        res = requests.post(archive_endpoint, headers=headers)
+        res = SESSION.post(archive_endpoint, headers=headers)
         res.raise_for_status()
         archive_json = res.json()
         archive = {}
         for arc in archive_json:
-            song_id = arc.get("song_id")
-            line = arc.get("line")
-            difficulty = arc.get("difficulty")
-            level = arc.get("level")
-            key = f"{song_id}|{line}|{difficulty}|{level}"
             decoded_at = datetime.fromisoformat(arc.get("decoded_at")).astimezone(
                 timezone.utc
             )
-            archive[key] = DecodeResult(
-                song_id,
-                line,
-                difficulty,
-                level,
+            record = DecodeResult(
+                arc.get("song_id"),
+                arc.get("line"),
+                arc.get("difficulty"),
+                arc.get("level"),
                 arc.get("judge"),
                 arc.get("score"),
                 arc.get("patch"),
@@ -797,6 +967,8 @@ def fetch_archive(b64_api_key: str) -> dict[str, DecodeResult]:
                 arc.get("is_full_combo"),
                 arc.get("is_max_patch"),
             )
+            # A later record for the same chart replaces the earlier one
+            archive[record.chart_key] = record
         return archive
     except requests.exceptions.HTTPError:
         raise ArchiveException("계정 정보 오류")
@@ -805,101 +977,209 @@ def fetch_archive(b64_api_key: str) -> dict[str, DecodeResult]:
 def fetch_latest_client_version() -> tuple[int, int, int]:
     """Fetch the latest client version"""
     client_version_endpoint = "https://www.platina-archive.app/api/v1/client_version"
-    res = requests.get(client_version_endpoint)
+    res = SESSION.get(client_version_endpoint)
     res.raise_for_status()
     data = res.json()
     return (data["major"], data["minor"], data["patch"])
 
 
-def fetch_songs():
-    """Fetches song and pattern data from the API."""
-    songs_endpoint = "https://www.platina-archive.app/api/v1/platina_songs"
-    patterns_endpoint = "https://www.platina-archive.app/api/v1/platina_patterns"
+def fetch_songs(force: bool = False):
+    """Fetches song and pattern data from the API.
 
+    A cache revalidated less than SONG_DB_TTL seconds ago is used without
+    asking the server, unless `force` is set.
+    """
     # check local storage
     DEFAULT_DATE = datetime(2025, 4, 10).isoformat()  # Date that needs update
     APPDATA_ROAMING = os.environ.get("APPDATA", os.path.expanduser("~"))
     CACHE_DIR = os.path.join(APPDATA_ROAMING, "PLATiNA-ARCHiVE", "cache")
     CACHED_DB_PATH = os.path.join(CACHE_DIR, "db.json")
+    CACHED_SONGS_PATH = os.path.join(CACHE_DIR, "db.pkl")
     songs_headers = {}
     patterns_headers = {}
-    cached_db = {}
-    needs_update = False
+    is_fresh = False
 
-    if os.path.isfile(CACHED_DB_PATH):
-        with open(CACHED_DB_PATH, "r") as f:
-            cached_db = json.load(f)
+    cached_db = _read_cached_db(CACHED_DB_PATH)
+    if cached_db:
         songs_last_modified = cached_db.get("Songs-Last-Modified", DEFAULT_DATE)
         patterns_last_modified = cached_db.get("Patterns-Last-Modified", DEFAULT_DATE)
         songs_headers = {"If-Modified-Since": songs_last_modified}
         patterns_headers = {"If-Modified-Since": patterns_last_modified}
+        # ETags validate more precisely when the server sends them
+        if cached_db.get("Songs-ETag"):
+            songs_headers["If-None-Match"] = cached_db["Songs-ETag"]
+        if cached_db.get("Patterns-ETag"):
+            patterns_headers["If-None-Match"] = cached_db["Patterns-ETag"]
+        # The file's mtime records when the server last confirmed the cache
+        fetched_at = os.path.getmtime(CACHED_DB_PATH)
+        is_fresh = not force and time.time() - fetched_at < SONG_DB_TTL
 
-    # Use POST method and check status
-    res_songs = requests.get(songs_endpoint, headers=songs_headers)
-    res_patterns = requests.get(patterns_endpoint, headers=patterns_headers)
-    res_songs.raise_for_status()
-    res_patterns.raise_for_status()
-
-    if res_songs.status_code == 304:
-        songs_json = cached_db["songs"]
-    else:
-        songs_json = res_songs.json()
-        new_songs_last_modified = res_songs.headers.get("Last-Modified")
-        cached_db["songs"] = songs_json
-        cached_db["Songs-Last-Modified"] = new_songs_last_modified
-        needs_update = True
-
-    if res_patterns.status_code == 304:
-        patterns_json = cached_db["patterns"]
-    else:
-        patterns_json = res_patterns.json()
-        new_patterns_last_modified = res_patterns.headers.get("Last-Modified")
-        cached_db["patterns"] = patterns_json
-        cached_db["Patterns-Last-Modified"] = new_patterns_last_modified
-        needs_update = True
-
-    if needs_update:
-        os.makedirs(CACHE_DIR, exist_ok=True)
-        with open(CACHED_DB_PATH, "w") as f:
-            json.dump(cached_db, f)
+    needs_update = False
+    if not is_fresh:
+        needs_update = _revalidate_song_db(cached_db, songs_headers, patterns_headers)
+        if needs_update:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _write_atomic(CACHED_DB_PATH, json.dumps(cached_db).encode("utf-8"))
+        else:
+            # Nothing changed, so just restart the TTL
+            os.utime(CACHED_DB_PATH)
+    songs_json = cached_db["songs"]
+    patterns_json = cached_db["patterns"]
+
+    # Reuse the Song objects built last time if the DB hasn't changed since
+    cache_stamp = (
+        SONG_CACHE_VERSION,
+        cached_db.get("Songs-Last-Modified"),
+        cached_db.get("Patterns-Last-Modified"),
+    )
+    if not needs_update:
+        cached_songs = _load_cached_songs(CACHED_SONGS_PATH, cache_stamp)
+        if cached_songs is not None:
+            return cached_songs
 
     # Build the Song objects
-    songs = {}
-    for song_data in songs_json:
-        song = Song(
-            song_id=song_data.get("songID"),
-            title=song_data.get("title"),
-            artist=song_data.get("artist", "").strip(),
+    songs = {
+        song_data["songID"]: Song(
+            id=song_data["songID"],
+            title=song_data["title"],
+            artist=(song_data.get("artist") or "").strip(),
             bpm=song_data.get("BPM"),
             dlc=song_data.get("DLC"),
             phash=song_data.get("pHash"),
             plus_phash=song_data.get("plusPHash"),
         )
-        songs[song.id] = song
+        for song_data in songs_json
+    }
 
-    # Link Patterns to Songs
+    # Group Patterns by song, then link each group in one call
+    patterns_by_song: defaultdict[int, list[Pattern]] = defaultdict(list)
     for pattern_data in patterns_json:
-        song_id = pattern_data.get("songID")
-        if song_id in songs:
-            pattern = Pattern(
-                line=pattern_data.get("line"),
-                difficulty=pattern_data.get("difficulty"),
-                level=pattern_data.get("level"),
+        patterns_by_song[pattern_data["songID"]].append(
+            Pattern(
+                line=pattern_data["line"],
+                difficulty=pattern_data["difficulty"],
+                level=pattern_data["level"],
                 designer=pattern_data.get("designer"),
             )
-            songs[song_id].add_pattern(pattern)
+        )
+    for song_id, patterns in patterns_by_song.items():
+        song = songs.get(song_id)
+        if song is not None:
+            song.add_patterns(patterns)
+
+    song_list = list(songs.values())
+    _dump_cached_songs(CACHED_SONGS_PATH, cache_stamp, song_list)
+    return song_list
+
+
+def _read_cached_db(path: str) -> dict:
+    """Reads the cached API responses; an unreadable cache counts as missing."""
+    try:
+        # Parse the raw bytes directly, skipping the text-mode decode
+        with open(path, "rb") as f:
+            cached_db = json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    # Without both bodies a 304 would leave nothing to build from
+    if (
+        not isinstance(cached_db, dict)
+        or "songs" not in cached_db
+        or "patterns" not in cached_db
+    ):
+        return {}
+    return cached_db
 
-    return list(songs.values())
+
+def _write_atomic(path: str, data: bytes):
+    """Writes to a temp file and swaps it in, so a crash can't leave half a file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _revalidate_song_db(
+    cached_db: dict, songs_headers: dict, patterns_headers: dict
+) -> bool:
+    """Sends the conditional GETs and merges any new data into cached_db.
+
+    Returns whether cached_db changed and needs to be written back.
+    """
+    songs_endpoint = "https://www.platina-archive.app/api/v1/platina_songs"
+    patterns_endpoint = "https://www.platina-archive.app/api/v1/platina_patterns"
+    needs_update = False
+
+    # The two revalidations are independent, so send them concurrently
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        songs_future = pool.submit(SESSION.get, songs_endpoint, headers=songs_headers)
+        patterns_future = pool.submit(
+            SESSION.get, patterns_endpoint, headers=patterns_headers
+        )
+        res_songs = songs_future.result()
+        res_patterns = patterns_future.result()
+    res_songs.raise_for_status()
+    res_patterns.raise_for_status()
+
+    if res_songs.status_code != 304:
+        # res.json() raises a RequestException on a non-JSON body, so the
+        # backoff retries a maintenance page like any other failed request
+        cached_db["songs"] = res_songs.json()
+        cached_db["Songs-Last-Modified"] = res_songs.headers.get("Last-Modified")
+        cached_db["Songs-ETag"] = res_songs.headers.get("ETag")
+        needs_update = True
+
+    if res_patterns.status_code != 304:
+        cached_db["patterns"] = res_patterns.json()
+        cached_db["Patterns-Last-Modified"] = res_patterns.headers.get("Last-Modified")
+        cached_db["Patterns-ETag"] = res_patterns.headers.get("ETag")
+        needs_update = True
+
+    return needs_update
+
+
+def fetch_songs_with_backoff(force: bool = False) -> list[Song]:
+    """Retries fetch_songs with capped exponential backoff.
+
+    Raises the last RequestException once FETCH_MAX_ATTEMPTS are used up.
+    """
+    delay = FETCH_INITIAL_DELAY
+    for attempt in range(FETCH_MAX_ATTEMPTS):
+        try:
+            return fetch_songs(force)
+        except requests.exceptions.RequestException:
+            if attempt == FETCH_MAX_ATTEMPTS - 1:
+                raise
+            # A little jitter keeps clients from retrying in lockstep
+            time.sleep(delay + random.random() * 0.1)
+            delay = min(delay * 2, FETCH_MAX_DELAY)
+
+
+def _load_cached_songs(path: str, stamp: tuple) -> Optional[list[Song]]:
+    """Loads pickled Song objects, or None if missing, stale or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            cached = pickle.loads(f.read())
+        if cached["stamp"] == stamp:
+            return cached["songs"]
+    except Exception:
+        pass
+    return None
+
+
+def _dump_cached_songs(path: str, stamp: tuple, songs: list[Song]):
+    """Pickles the built Song objects; the cache is optional, so errors are ignored."""
+    try:
+        data = pickle.dumps(
+            {"stamp": stamp, "songs": songs}, protocol=pickle.HIGHEST_PROTOCOL
+        )
+        _write_atomic(path, data)
+    except OSError:
+        pass
 
 
 if __name__ == "__main__":
     # 1. Fetch data once at startup
-    song_data = None
-    while not song_data:
-        try:
-            song_data = fetch_songs()
-        except requests.exceptions.RequestException as e:
-            time.sleep(0.5)  # Try again after 0.5s
+    song_data = fetch_songs_with_backoff()
 
     # 2. Initialize the analyzer
     analyzer = ScreenshotAnalyzer(song_data)
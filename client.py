@@ -5,9 +5,11 @@ import math
 import sys
 import os
 import threading
-import time
 import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
+from itertools import groupby
+from time import strftime
 from tkinter import messagebox, ttk
 
 import requests
@@ -15,23 +17,47 @@ from PIL import Image, ImageTk
 from pynput import keyboard
 
 from analyzer import (
+    SESSION,
     ScreenshotAnalyzer,
     fetch_archive,
-    fetch_songs,
+    fetch_songs_with_backoff,
     fetch_latest_client_version,
     version_to_string,
 )
 from login import RegisterWindow, _check_local_key, LoginWindow, delete_local_key
-from models import AnalysisReport, DecodeResult, ArchiveException
+from models import AnalysisReport, DecodeResult, Difficulty, ArchiveException
 
 VERSION = (0, 3, 4)
 current_version_str = version_to_string(VERSION)
+SONG_DATA_ERROR = (
+    "곡 데이터를 불러오지 못했습니다. Reload song DB 버튼으로 다시 시도해주세요."
+)
+
+# Bound once so the per-analysis display code skips the attribute lookups
+_LANCZOS = Image.Resampling.LANCZOS
+_NW = tk.NW
+_END = tk.END
+
+# Archive uploads go out on these threads so the GUI never waits on the server
+POST_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+# Seconds pending uploads get to finish once the window has closed
+UPLOAD_DRAIN_TIMEOUT = 5
+
+# Number of jacket previews kept around for songs analyzed again
+JACKET_PHOTO_CACHE_SIZE = 32
+
 if getattr(sys, "frozen", False):
     BASEDIR = os.path.dirname(sys.executable)
 else:
     BASEDIR = os.path.dirname(os.path.abspath(__file__))
 
 
+def _now_prefix() -> str:
+    """Local time prefix for log lines, e.g. "[13:05:09] "."""
+    return strftime("[%H:%M:%S] ")
+
+
 class PlatinaArchiveClient:
     def __init__(self, app):
         self.app = app
@@ -52,6 +78,10 @@ class PlatinaArchiveClient:
         self.analyzer = None
         self.archive = None
         self.decoder_name = None
+        self._log_buffer: list[tuple[str, str]] = []
+        self._jacket_photos: dict[tuple[int, bool], ImageTk.PhotoImage] = {}
+        self._pending_uploads: set[Future] = set()
+        self._closing = False
         self.api_key = _check_local_key()
 
         self.top_frame = ttk.Frame(app, style="Top.TFrame")
@@ -147,7 +177,44 @@ class PlatinaArchiveClient:
             app, text="Reload song DB", command=self.load_db
         )
         self.reload_db_button.pack(side=tk.BOTTOM, pady=5)
-        latest_version = fetch_latest_client_version()
+
+        if self.api_key:
+            self.b64_api_key: str = base64.b64encode(
+                self.api_key.encode("utf-8")
+            ).decode("utf-8")
+            SESSION.headers["X-API-Key"] = self.b64_api_key
+            self.decoder_name = self.api_key.split("::")[0]
+            self.log_message(f"{self.decoder_name}님, 환영합니다.")
+        else:
+            self.app.after(0, self._prompt_account)
+
+        # Fetch startup data in the background so the window shows up right away
+        threading.Thread(target=self._bootstrap, daemon=True).start()
+
+    def _bootstrap(self):
+        """Sends the independent startup requests together.
+
+        Each result is handed to the GUI thread through app.after as soon as
+        it arrives.
+        """
+        with ThreadPoolExecutor(max_workers=3) as startup_pool:
+            startup_pool.submit(fetch_latest_client_version).add_done_callback(
+                lambda future: self.app.after(0, self._show_latest_version, future)
+            )
+            if self.api_key:
+                startup_pool.submit(fetch_archive, self.b64_api_key).add_done_callback(
+                    lambda future: self.app.after(0, self._load_archive, future)
+                )
+            startup_pool.submit(fetch_songs_with_backoff).add_done_callback(
+                lambda future: self.app.after(0, self._load_song_data, future)
+            )
+
+    def _show_latest_version(self, future: Future):
+        try:
+            latest_version = future.result()
+        except requests.exceptions.RequestException:
+            self.log_error(ArchiveException("클라이언트 버전 확인에 실패했습니다."))
+            return
         if latest_version > VERSION:
             latest_version_str = version_to_string(latest_version)
             self.log_message(
@@ -157,35 +224,28 @@ class PlatinaArchiveClient:
         else:
             self.log_message("클라이언트가 최신 버전입니다.")
 
-        if not self.api_key:
-            if messagebox.askyesno(
-                "PLATiNA-ARCHiVE 로그인 / 등록",
-                "계정 정보가 등록되어 있지 않습니다, 새로운 디코더로 등록하시겠습니까? (아니오 선택시 로그인 창으로 이동됩니다.)",
-            ):
-                RegisterWindow(self.app, self._handle_successful_register)
-            else:
-                LoginWindow(self.app, self._handle_successful_login)
+    def _load_archive(self, future: Future):
+        try:
+            self.archive = future.result()
+        except ArchiveException as e:
+            self.log_error(str(e))
+            delete_local_key()
+            self._prompt_account()
+        except requests.exceptions.RequestException:
+            self.log_error(
+                ArchiveException(
+                    "기록 데이터를 불러오지 못했습니다. 클라이언트를 다시 시작해주세요."
+                )
+            )
 
+    def _prompt_account(self):
+        if messagebox.askyesno(
+            "PLATiNA-ARCHiVE 로그인 / 등록",
+            "계정 정보가 등록되어 있지 않습니다, 새로운 디코더로 등록하시겠습니까? (아니오 선택시 로그인 창으로 이동됩니다.)",
+        ):
+            RegisterWindow(self.app, self._handle_successful_register)
         else:
-            self.b64_api_key: str = base64.b64encode(
-                self.api_key.encode("utf-8")
-            ).decode("utf-8")
-            self.decoder_name = self.api_key.split("::")[0]
-            self.log_message(f"{self.decoder_name}님, 환영합니다.")
-            try:
-                self.archive = fetch_archive(self.b64_api_key)
-            except ArchiveException as e:
-                self.log_error(str(e))
-                delete_local_key()
-                if messagebox.askyesno(
-                    "PLATiNA-ARCHiVE 로그인 / 등록",
-                    "계정 정보가 등록되어 있지 않습니다, 새로운 디코더로 등록하시겠습니까? (아니오 선택시 로그인 창으로 이동됩니다.)",
-                ):
-                    RegisterWindow(self.app, self._handle_successful_register)
-                else:
-                    LoginWindow(self.app, self._handle_successful_login)
-
-        self.load_db()
+            LoginWindow(self.app, self._handle_successful_login)
 
     def _handle_successful_register(self, name: str, api_key: str):
         self.decoder_name = name
@@ -193,6 +253,7 @@ class PlatinaArchiveClient:
         self.b64_api_key = base64.b64encode(self.api_key.encode("utf-8")).decode(
             "utf-8"
         )
+        SESSION.headers["X-API-Key"] = self.b64_api_key
         self.archive = fetch_archive(self.b64_api_key)
         self.log_message(f"등록 성공. 환영합니다, {name}님.")
 
@@ -202,6 +263,7 @@ class PlatinaArchiveClient:
         self.b64_api_key = base64.b64encode(self.api_key.encode("utf-8")).decode(
             "utf-8"
         )
+        SESSION.headers["X-API-Key"] = self.b64_api_key
         self.archive = fetch_archive(self.b64_api_key)
         self.log_message(f"로그인 성공. 돌아오신걸 환영합니다, {name}님.")
 
@@ -219,9 +281,25 @@ class PlatinaArchiveClient:
         thread.daemon = True
         thread.start()
 
+    def _is_ready(self) -> bool:
+        """Logs a notice and returns False while startup data is still loading."""
+        if self.analyzer is None:
+            self.log_message(
+                "곡 데이터를 불러오는 중입니다, 잠시 후 다시 시도해주세요."
+            )
+            return False
+        if self.archive is None:
+            self.log_message(
+                "기록 데이터를 불러오는 중입니다, 잠시 후 다시 시도해주세요."
+            )
+            return False
+        return True
+
     def _execute_analysis(self):
         """Run the analysis"""
         self.log_message("Hotkey detected...")
+        if not self._is_ready():
+            return
         try:
             report = self.analyzer.extract_info()
             self.app.after(
@@ -231,36 +309,67 @@ class PlatinaArchiveClient:
             self.log_error(e)
 
     def load_db(self):
-        # Fetch song data
-        song_data = None
-        while not song_data:
-            try:
-                song_data = fetch_songs()
-            except:
-                time.sleep(0.5)  # Try again after 0.5s
+        try:
+            # The reload button always asks the server, ignoring the cache TTL
+            self._set_song_data(fetch_songs_with_backoff(force=True))
+        except requests.exceptions.RequestException:
+            self.log_error(ArchiveException(SONG_DATA_ERROR))
+
+    def _load_song_data(self, future: Future):
+        try:
+            self._set_song_data(future.result())
+        except requests.exceptions.RequestException:
+            self.log_error(ArchiveException(SONG_DATA_ERROR))
+
+    def _set_song_data(self, song_data):
         self.log_message(f"곡 데이터 {len(song_data)}개 로딩 완료")
         self.analyzer = ScreenshotAnalyzer(song_data)
 
     def log_message(self, msg):
-        now = datetime.now()
-        structured_time = f"[{now.hour:02d}:{now.minute:02d}:{now.second:02d}] "
-        self.log_text.insert(tk.END, structured_time + msg + "\n", "general")
-        self.log_text.see(tk.END)
+        self.log_text.insert(_END, _now_prefix() + msg + "\n", "general")
+        self.log_text.see(_END)
 
     def log_error(self, err: ArchiveException):
-        now = datetime.now()
-        structured_time = f"[{now.hour:02d}:{now.minute:02d}:{now.second:02d}] "
-        self.log_text.insert(tk.END, structured_time + str(err) + "\n", "error")
-        self.log_text.see(tk.END)
+        self.log_text.insert(_END, _now_prefix() + str(err) + "\n", "error")
+        self.log_text.see(_END)
+
+    def queue_log(self, msg: str, tag: str = "general"):
+        """Queues a log line to be written by the next flush_log()."""
+        self._log_buffer.append((tag, msg))
+
+    def flush_log(self):
+        """Writes queued lines with one Tk insert per run of same-tag lines."""
+        if not self._log_buffer:
+            return
+        prefix = _now_prefix()
+        for tag, entries in groupby(self._log_buffer, key=lambda entry: entry[0]):
+            lines = "".join(prefix + msg + "\n" for _, msg in entries)
+            self.log_text.insert(_END, lines, tag)
+        self._log_buffer.clear()
+        self.log_text.see(_END)
+
+    def _get_jacket_photo(self, report: AnalysisReport) -> ImageTk.PhotoImage:
+        """Returns the 200x200 jacket preview, reusing it for recently seen songs."""
+        # PLUS charts have their own jacket art, so they get their own entry
+        cache_key = (report.song.id, report.difficulty is Difficulty.PLUS)
+        photo = self._jacket_photos.pop(cache_key, None)
+        if photo is None:
+            # reducing_gap box-reduces big crops first, so LANCZOS only sees ~2x
+            resized_jacket_image = report.jacket_image.resize(
+                (200, 200), _LANCZOS, reducing_gap=2.0
+            )
+            photo = ImageTk.PhotoImage(resized_jacket_image)
+            if len(self._jacket_photos) >= JACKET_PHOTO_CACHE_SIZE:
+                self._jacket_photos.pop(next(iter(self._jacket_photos)))
+        # Re-insert so the dict stays in least-recently-used order
+        self._jacket_photos[cache_key] = photo
+        return photo
 
     def update_display(self, report: AnalysisReport):
-        # Size: 400x400
-        resized_jacket_image = report.jacket_image.resize(
-            (200, 200), Image.Resampling.LANCZOS
-        )
-        self.jacket_photo = ImageTk.PhotoImage(resized_jacket_image)
+        self.jacket_photo = self._get_jacket_photo(report)
+        report.release_image()
         self.jacket_canvas.delete("all")
-        self.jacket_canvas.create_image(0, 0, image=self.jacket_photo, anchor=tk.NW)
+        self.jacket_canvas.create_image(0, 0, image=self.jacket_photo, anchor=_NW)
 
         # Update labels
         self.song_name_label.config(text=report.song.title)
@@ -279,29 +388,26 @@ class PlatinaArchiveClient:
         )
 
         # Log results
-        self.log_message("--- Analysis Complete ---")
+        self.queue_log("--- Analysis Complete ---")
         # self.log_message(f"Read hash: {report.jacket_hash}")
         # self.log_message(f"Match distance: {report.match_distance}")
         if report.match_distance > 5:
-            self.log_message(
+            self.queue_log(
                 f"Warning: Jacket match distance {report.match_distance} is high. Result might be uncertain."
             )
         # Do sanity check for ocr-read level
         if not report.level in report.song.get_available_levels(
             report.line, report.difficulty
         ):
-            self.log_message(
+            self.queue_log(
                 f"Warning: Level {report.level} is NOT registered on DB. Result might be uncertain."
             )
 
         # Compare to user's archive
-        archive_key = (
-            f"{report.song.id}|{report.line}|{report.difficulty}|{report.level}"
-        )
         utc_now = datetime.now(timezone.utc)
-        existing_archive = self.archive.get(
-            archive_key,
-            DecodeResult(
+        existing_archive = self.archive.get(report.archive_key)
+        if existing_archive is None:
+            existing_archive = DecodeResult(
                 report.song.id,
                 report.line,
                 report.difficulty,
@@ -312,23 +418,22 @@ class PlatinaArchiveClient:
                 utc_now,
                 False,
                 False,
-            ),
-        )
+            )
         if report.judge > existing_archive.judge:
-            self.log_higher_score_and_report(report, existing_archive)
+            self.log_higher_score_and_report(report, existing_archive, utc_now)
             return
         elif report.judge == existing_archive.judge:
             if report.score > existing_archive.score:
-                self.log_higher_score_and_report(report, existing_archive)
+                self.log_higher_score_and_report(report, existing_archive, utc_now)
                 return
             elif report.score == existing_archive.score:
                 if report.is_full_combo and not existing_archive.is_full_combo:
-                    self.log_higher_score_and_report(report, existing_archive)
+                    self.log_higher_score_and_report(report, existing_archive, utc_now)
                     return
         # Not a better score
         dt = utc_now - existing_archive.decoded_at
         dt_msg = f"{dt.days}일, {dt.seconds // 3600}시간 전"
-        self.log_message(
+        self.queue_log(
             f" [미갱신] {report.song.title} {report.line}L {report.difficulty} Lv.{report.level} ({dt_msg})"
         )
         judge_msg = f"Best Judge: {existing_archive.judge}%"
@@ -338,14 +443,18 @@ class PlatinaArchiveClient:
             judge_msg += " [PERFECT DECODE]"
         elif existing_archive.is_full_combo:
             judge_msg += " [FULL COMBO]"
-        self.log_message(judge_msg)
-        self.log_message(f"Best Score: {existing_archive.score:,}")
-        self.log_message(f"Best P.A.T.C.H.: {existing_archive.patch}")
+        self.queue_log(judge_msg)
+        self.queue_log(f"Best Score: {existing_archive.score:,}")
+        self.queue_log(f"Best P.A.T.C.H.: {existing_archive.patch}")
+        self.flush_log()
 
     def log_higher_score_and_report(
-        self, new_archive: AnalysisReport, existing_archive: DecodeResult
+        self,
+        new_archive: AnalysisReport,
+        existing_archive: DecodeResult,
+        utc_now: datetime,
     ):
-        self.log_message(
+        self.queue_log(
             f" [갱신] {new_archive.song.title} {new_archive.line}L {new_archive.difficulty} Lv.{new_archive.level}"
         )
         judge_msg = f"Judge: {existing_archive.judge}%"
@@ -363,18 +472,18 @@ class PlatinaArchiveClient:
         djudge = round(new_archive.judge - existing_archive.judge, 4)
         judge_msg += f" (+{djudge}%p)"
 
-        self.log_message(judge_msg)
+        self.queue_log(judge_msg)
         dscore = new_archive.score - existing_archive.score
         if dscore >= 0:
-            self.log_message(
+            self.queue_log(
                 f"Score: {existing_archive.score:,} -> {new_archive.score:,} (+{dscore:,})"
             )
         else:
-            self.log_message(
+            self.queue_log(
                 f"Score: {existing_archive.score:,} -> {new_archive.score:,} ({dscore:,})"
             )
         dpatch = round(new_archive.patch - existing_archive.patch, 2)
-        self.log_message(
+        self.queue_log(
             f"P.A.T.C.H.: {existing_archive.patch} -> {new_archive.patch} (+{dpatch})"
         )
         if (
@@ -384,48 +493,57 @@ class PlatinaArchiveClient:
         ):
             theoretical_perfect_high = math.ceil(new_archive.total_notes * 0.98)
             need_perfect_high = theoretical_perfect_high - new_archive.perfect_high
-            self.log_message(f"패론치까지 단 {need_perfect_high}개!")
-        # report higher score to the server
+            self.queue_log(f"패론치까지 단 {need_perfect_high}개!")
+        self.flush_log()
+        # report higher score to the server without blocking the GUI thread
+        upload = POST_EXECUTOR.submit(self._post_archive_update, new_archive.json())
+        self._pending_uploads.add(upload)
+        upload.add_done_callback(self._on_archive_update_done)
+        # update internal archive
+        self.archive[new_archive.archive_key] = existing_archive.with_updates(
+            judge=new_archive.judge,
+            score=new_archive.score,
+            patch=new_archive.patch,
+            decoded_at=utc_now,
+            is_full_combo=new_archive.is_full_combo,
+            is_max_patch=new_archive.is_maximum_patch,
+        )
+
+    @staticmethod
+    def _post_archive_update(payload: dict):
         update_archive_endpoint = (
             "https://www.platina-archive.app/api/v2/update_archive"
         )
-        headers = {
-            "X-API-Key": self.b64_api_key,
-            "Content-Type": "application/json",
-        }
-        requests.post(update_archive_endpoint, json=new_archive.json(), headers=headers)
-        # update internal archive
-        archive_key = f"{new_archive.song.id}|{new_archive.line}|{new_archive.difficulty}|{new_archive.level}"
-        internal_archive = self.archive.get(
-            archive_key,
-            DecodeResult(
-                new_archive.song.id,
-                new_archive.line,
-                new_archive.difficulty,
-                new_archive.level,
-                0.0,
-                0,
-                0.0,
-                datetime.now(timezone.utc),
-                False,
-                False,
-            ),
-        )
-        internal_archive.judge = new_archive.judge
-        internal_archive.score = new_archive.score
-        internal_archive.patch = new_archive.patch
-        internal_archive.decoded_at = datetime.now(timezone.utc)
-        internal_archive.is_full_combo = new_archive.is_full_combo
-        internal_archive.is_max_patch = new_archive.is_maximum_patch
-        self.archive[archive_key] = internal_archive
+        # The session already carries the API key; json= sets the Content-Type
+        res = SESSION.post(update_archive_endpoint, json=payload, timeout=5)
+        res.raise_for_status()
+
+    def _on_archive_update_done(self, future: Future):
+        """Reports a failed archive upload on the GUI thread."""
+        self._pending_uploads.discard(future)
+        # The window may already be gone, so there is nowhere to report to
+        if self._closing or future.cancelled():
+            return
+        if future.exception() is not None:
+            self.app.after(
+                0, self.log_error, ArchiveException("기록 업로드에 실패했습니다.")
+            )
 
     def _on_close(self):
         """Stops the global hotkey listener and closes the app"""
         self.hotkey_listener.stop()
+        self._closing = True
+        # Close the window first so slow uploads can't make it look frozen
         self.app.destroy()
+        # Give in-flight archive uploads a bounded chance to finish
+        wait(list(self._pending_uploads), timeout=UPLOAD_DRAIN_TIMEOUT)
+        POST_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+        SESSION.close()
 
     def run_analysis(self, event=None):
         self.log_message("Reading clipboard for image...")
+        if not self._is_ready():
+            return
         try:
             report = self.analyzer.extract_info()
             self.update_display(report)
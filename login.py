@@ -7,6 +7,8 @@ import keyring
 from keyring.backends import Windows
 import requests
 
+from analyzer import SESSION
+
 keyring.set_keyring(Windows.WinVaultKeyring())
 KEYRING_SERVICE_ID = "PlatinaArchiveClient"
 KEYRING_USER_ID = "main_api_key"
@@ -72,7 +74,7 @@ class LoginWindow(tk.Toplevel):
             messagebox.showerror("Error", "이름과 비밀번호는 공백일 수 없습니다.")
             return
         try:
-            response = requests.post(
+            response = SESSION.post(
                 api_login_endpoint, json={"name": name, "password": password}
             )
             response.raise_for_status()
@@ -148,7 +150,7 @@ class RegisterWindow(tk.Toplevel):
             return
 
         try:
-            response = requests.post(
+            response = SESSION.post(
                 register_endpoint, json={"name": name, "password": password}
             )
             response.raise_for_status()
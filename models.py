@@ -1,324 +1,278 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Literal
+from enum import Enum, IntEnum
+from operator import attrgetter
+from typing import Literal, NamedTuple
 
-from imagehash import ImageHash
 from PIL import Image
 
-
-class ArchiveException(Exception):
-    def __init__(self, msg: str):
-        self.msg = msg
+# Field names of the update_archive payload, in AnalysisReport.json() order
+_JSON_KEYS = (
+    "song_id",
+    "line",
+    "difficulty",
+    "level",
+    "judge",
+    "score",
+    "patch",
+    "is_full_combo",
+    "is_max_patch",
+)
+# Reads the payload values for _JSON_KEYS from a report in one C-level call
+_JSON_GETTER = attrgetter(
+    "song.id",
+    "line",
+    "difficulty",
+    "level",
+    "judge",
+    "score",
+    "patch",
+    "is_full_combo",
+    "is_maximum_patch",
+)
+
+
+class Difficulty(str, Enum):
+    EASY = "EASY"
+    HARD = "HARD"
+    OVER = "OVER"
+    PLUS = "PLUS"
 
     def __str__(self):
-        return f"Error: {self.msg}"
-
-
-class DecodeResult:
-    def __init__(
-        self,
-        song_id: int,
-        line: Literal[4, 6],
-        difficulty: Literal["EASY", "HARD", "OVER", "PLUS"],
-        level: int,
-        judge: float,
-        score: int,
-        patch: float,
-        decoded_at: datetime,
-        is_full_combo: bool,
-        is_max_patch: bool,
-    ):
-        self._song_id = song_id
-        self._line = line
-        self._difficulty = difficulty
-        self._level = level
-        self._judge = judge
-        self._score = score
-        self._patch = patch
-        self._decoded_at = decoded_at
-        self._is_full_combo = is_full_combo
-        self._is_max_patch = is_max_patch
+        return self.value
 
-    @property
-    def song_id(self):
-        return self._song_id
 
-    @property
-    def line(self):
-        return self._line
+class Line(IntEnum):
+    FOUR = 4
+    SIX = 6
 
-    @property
-    def difficulty(self):
-        return self._difficulty
 
-    @property
-    def level(self):
-        return self._level
+class Rank(IntEnum):
+    """Result ranks in ascending order; str() gives the in-game label."""
 
-    @property
-    def judge(self):
-        return self._judge
-
-    @judge.setter
-    def judge(self, new_judge: float):
-        self._judge = new_judge
+    F = 0
+    C = 1
+    B = 2
+    A = 3
+    A_PLUS = 4
+    AA = 5
+    AA_PLUS = 6
+    S = 7
+    S_PLUS = 8
+    SS = 9
+    SS_PLUS = 10
 
     @property
-    def score(self):
-        return self._score
+    def display(self) -> str:
+        return _RANK_DISPLAY[self]
 
-    @score.setter
-    def score(self, new_score: int):
-        self._score = new_score
+    def __str__(self):
+        return _RANK_DISPLAY[self]
 
-    @property
-    def patch(self):
-        return self._patch
+    def __format__(self, format_spec):
+        return format(_RANK_DISPLAY[self], format_spec)
 
-    @patch.setter
-    def patch(self, new_patch: float):
-        self._patch = new_patch
 
-    @property
-    def decoded_at(self):
-        return self._decoded_at
+_RANK_DISPLAY = {rank: rank.name.replace("_PLUS", "+") for rank in Rank}
+_RANK_BY_DISPLAY = {display: rank for rank, display in _RANK_DISPLAY.items()}
 
-    @decoded_at.setter
-    def decoded_at(self, new_decoded_at: datetime):
-        self._decoded_at = new_decoded_at
 
-    @property
-    def is_full_combo(self):
-        return self._is_full_combo
+def _as_difficulty(difficulty: str) -> Difficulty | str:
+    """Interns a difficulty to its enum member, leaving unknown values as-is."""
+    try:
+        return Difficulty(difficulty)
+    except ValueError:
+        return difficulty
 
-    @is_full_combo.setter
-    def is_full_combo(self, new_is_full_combo: bool):
-        self._is_full_combo = new_is_full_combo
 
-    @property
-    def is_max_patch(self):
-        return self._is_max_patch
+def _as_rank(rank: Rank | str) -> Rank | str:
+    """Maps a rank label such as "AA+" to its Rank, leaving unknown values as-is."""
+    if isinstance(rank, Rank):
+        return rank
+    return _RANK_BY_DISPLAY.get(rank, rank)
 
-    @is_max_patch.setter
-    def is_max_patch(self, new_is_max_patch: bool):
-        self._is_max_patch = new_is_max_patch
 
+def _as_line(line: int) -> Line | int:
+    """Interns a line count to its enum member, leaving unknown values as-is."""
+    try:
+        return Line(line)
+    except ValueError:
+        return line
 
-class AnalysisReport:
-    def __init__(
-        self,
-        song: Song,
-        score: int,
-        judge: float,
-        patch: float,
-        line: Literal[4, 6],
-        difficulty: Literal["EASY", "HARD", "OVER", "PLUS"],
-        level: int,
-        jacket_image: Image.Image,
-        jacket_hash: ImageHash,
-        match_distance,
-        rank: str,
-        is_full_combo: bool,
-        is_perfect_decode: bool,
-        is_maximum_patch: bool,
-        total_notes: int = 0,
-        perfect_high: int = 0,
-    ):
-        self._song = song
-        self._score = score
-        self._judge = judge
-        self._patch = patch
-        self._line = line
-        self._difficulty = difficulty
-        self._level = level
-        self._jacket_image = jacket_image
-        self._jacket_hash = jacket_hash
-        self._match_distance = match_distance
-        self._rank = rank
-        self._is_full_combo = is_full_combo
-        self._is_perfect_decode = is_perfect_decode
-        self._is_maximum_patch = is_maximum_patch
-        self._total_notes = total_notes
-        self._perfect_high = perfect_high
 
-    def __str__(self):
-        return f"{self.song.title} - {self.song.artist} | {self.line}L {self.difficulty} Lv.{self.level}\nJudge: {self.judge}%\nScore: {self.score}\nP.A.T.C.H.: {self.patch}"
-
-    def json(self):
-        return {
-            "song_id": self.song.id,
-            "line": self.line,
-            "difficulty": self.difficulty,
-            "level": self.level,
-            "judge": self.judge,
-            "score": self.score,
-            "patch": self.patch,
-            "is_full_combo": self.is_full_combo,
-            "is_max_patch": self.is_maximum_patch,
-        }
-
-    @property
-    def song(self):
-        return self._song
-
-    @property
-    def score(self):
-        return self._score
-
-    @property
-    def judge(self):
-        return self._judge
+class ArchiveException(Exception):
+    __slots__ = ("msg", "_str")
 
-    @property
-    def patch(self):
-        return self._patch
+    def __init__(self, msg: str):
+        super().__init__(msg)
+        self.msg = msg
+        self._str = f"Error: {msg}"
 
-    @property
-    def line(self):
-        return self._line
+    def __str__(self):
+        return self._str
 
-    @property
-    def difficulty(self):
-        return self._difficulty
 
-    @property
-    def level(self):
-        return self._level
+class DecodeResult(NamedTuple):
+    song_id: int
+    line: Literal[4, 6]
+    difficulty: Literal["EASY", "HARD", "OVER", "PLUS"]
+    level: int
+    judge: float
+    score: int
+    patch: float
+    decoded_at: datetime
+    is_full_combo: bool
+    is_max_patch: bool
 
-    @property
-    def jacket_image(self):
-        return self._jacket_image
+    def with_updates(self, **changes) -> DecodeResult:
+        """Returns a copy with the given fields replaced."""
+        return self._replace(**changes)
 
     @property
-    def jacket_hash(self):
-        return self._jacket_hash
+    def chart_key(self) -> tuple:
+        """(song_id, line, difficulty, level): the chart this record belongs to."""
+        return self[:4]
 
-    @property
-    def match_distance(self):
-        return self._match_distance
 
-    @property
-    def rank(self):
-        return self._rank
+@dataclass(slots=True, eq=False)
+class AnalysisReport:
+    song: Song
+    score: int
+    judge: float
+    patch: float
+    line: Literal[4, 6]
+    difficulty: Literal["EASY", "HARD", "OVER", "PLUS"]
+    level: int
+    jacket_image: Image.Image | None
+    jacket_hash: int
+    match_distance: int
+    rank: Rank
+    is_full_combo: bool
+    is_perfect_decode: bool
+    is_maximum_patch: bool
+    total_notes: int = 0
+    perfect_high: int = 0
+    # Key of this chart in the user's archive, same as DecodeResult.chart_key
+    archive_key: tuple = field(init=False)
+    # Reports aren't changed after analysis, so str()/json() are built once
+    _str: str | None = field(default=None, init=False, repr=False)
+    _json: dict | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self.line = _as_line(self.line)
+        self.difficulty = _as_difficulty(self.difficulty)
+        self.rank = _as_rank(self.rank)
+        self.archive_key = (self.song.id, self.line, self.difficulty, self.level)
 
-    @property
-    def is_full_combo(self):
-        return self._is_full_combo
+    def __str__(self):
+        if self._str is None:
+            self._str = f"{self.song.title} - {self.song.artist} | {self.line}L {self.difficulty} Lv.{self.level}\nJudge: {self.judge}%\nScore: {self.score}\nP.A.T.C.H.: {self.patch}"
+        return self._str
 
     @property
-    def is_perfect_decode(self):
-        return self._is_perfect_decode
+    def rank_display(self) -> str:
+        return str(self.rank)
 
-    @property
-    def is_maximum_patch(self):
-        return self._is_maximum_patch
+    def release_image(self):
+        """Drops the jacket crop once it has been displayed; jacket_hash remains."""
+        self.jacket_image = None
 
-    @property
-    def total_notes(self):
-        return self._total_notes
+    def hamming(self, other_hash: int) -> int:
+        """Hamming distance between the jacket pHash and another packed pHash."""
+        return (self.jacket_hash ^ other_hash).bit_count()
 
-    @property
-    def perfect_high(self):
-        return self._perfect_high
+    def json(self):
+        """Returns the update_archive payload; callers must not modify it."""
+        if self._json is None:
+            self._json = dict(zip(_JSON_KEYS, _JSON_GETTER(self)))
+        return self._json
 
 
+@dataclass(slots=True, frozen=True)
 class Pattern:
-    def __init__(
-        self,
-        line: Literal[4, 6],
-        difficulty: Literal["EASY", "HARD", "OVER", "PLUS"],
-        level: int,
-        designer: str,
-    ):
-        self._line = line
-        self._difficulty = difficulty
-        self._level = level
-        self._designer = designer
-
-    @property
-    def line(self):
-        return self._line
-
-    @property
-    def difficulty(self):
-        return self._difficulty
-
-    @property
-    def level(self):
-        return self._level
+    line: Literal[4, 6]
+    difficulty: Literal["EASY", "HARD", "OVER", "PLUS"]
+    level: int
+    designer: str
 
-    @property
-    def designer(self):
-        return self._designer
+    def __post_init__(self):
+        # Frozen, so the coerced values have to bypass __setattr__
+        object.__setattr__(self, "line", _as_line(self.line))
+        object.__setattr__(self, "difficulty", _as_difficulty(self.difficulty))
 
     def __str__(self):
         return f"{self.line}L {self.difficulty} Lv.{self.level} by {self.designer}"
 
 
+@dataclass(slots=True, eq=False)
 class Song:
-    def __init__(
-        self,
-        song_id: int,
-        title: str,
-        artist: str,
-        bpm: str,
-        dlc: str,
-        phash: str | None,
-        plus_phash: str | None,
-    ):
-        self._id = song_id
-        self._title = title
-        self._artist = artist
-        self._bpm = bpm
-        self._dlc = dlc
-        self._phash = phash
-        self._plus_phash = plus_phash
-        self._patterns: list[Pattern] = []
-
-    @property
-    def id(self):
-        return self._id
-
-    @property
-    def title(self):
-        return self._title
-
-    @property
-    def artist(self):
-        return self._artist
-
-    @property
-    def bpm(self):
-        return self._bpm
-
-    @property
-    def dlc(self):
-        return self._dlc
-
-    @property
-    def phash(self):
-        return self._phash
-
-    @property
-    def plus_phash(self):
-        return self._plus_phash
-
-    @property
-    def patterns(self):
-        return self._patterns
+    id: int
+    title: str
+    artist: str
+    bpm: str
+    dlc: str
+    phash: str | None
+    plus_phash: str | None
+    # Patterns are stored column-wise; see the `patterns` view below
+    _pattern_lines: list[int] = field(default_factory=list, init=False, repr=False)
+    _pattern_difficulties: list[str] = field(
+        default_factory=list, init=False, repr=False
+    )
+    _pattern_levels: list[int] = field(default_factory=list, init=False, repr=False)
+    _pattern_designers: list[str] = field(default_factory=list, init=False, repr=False)
+    # (line, difficulty) -> levels, kept in step with patterns
+    _level_index: dict[tuple[int, str], list[int]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    # Packed 64-bit forms of the hex pHashes, decoded on first use
+    _phash_u64: int | None = field(default=None, init=False, repr=False)
+    _plus_phash_u64: int | None = field(default=None, init=False, repr=False)
+
+    @property
+    def phash_u64(self) -> int | None:
+        if self._phash_u64 is None and self.phash:
+            self._phash_u64 = int(self.phash, 16)
+        return self._phash_u64
+
+    @property
+    def plus_phash_u64(self) -> int | None:
+        if self._plus_phash_u64 is None and self.plus_phash:
+            self._plus_phash_u64 = int(self.plus_phash, 16)
+        return self._plus_phash_u64
+
+    @property
+    def patterns(self) -> list[Pattern]:
+        """Pattern objects rebuilt from the columns, for code that iterates them."""
+        return [
+            Pattern(line, difficulty, level, designer)
+            for line, difficulty, level, designer in zip(
+                self._pattern_lines,
+                self._pattern_difficulties,
+                self._pattern_levels,
+                self._pattern_designers,
+            )
+        ]
 
     def add_pattern(self, pattern: Pattern):
-        self._patterns.append(pattern)
+        self._pattern_lines.append(pattern.line)
+        self._pattern_difficulties.append(pattern.difficulty)
+        self._pattern_levels.append(pattern.level)
+        self._pattern_designers.append(pattern.designer)
+        self._level_index.setdefault((pattern.line, pattern.difficulty), []).append(
+            pattern.level
+        )
+
+    def add_patterns(self, patterns: list[Pattern]):
+        for pattern in patterns:
+            self.add_pattern(pattern)
 
     def get_available_levels(
         self, line: Literal[4, 6], difficulty: Literal["EASY", "HARD", "OVER", "PLUS"]
     ) -> list[int]:
-        levels = []
-        for pattern in self._patterns:
-            if pattern.line == line and pattern.difficulty == difficulty:
-                levels.append(pattern.level)
-        return levels
+        # Copy, so callers can't edit the index through the result
+        return list(self._level_index.get((line, difficulty), ()))
 
 
 if __name__ == "__main__":
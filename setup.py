@@ -9,13 +9,12 @@ build_exe_options = {
     "packages": [
         "tkinter",
         "PIL",
-        "imagehash",
+        "numpy",
         "pytesseract",
         "requests",
         "keyring",
         "keyring.backends.Windows",
         "pynput",
-        "scipy",
         "win32ctypes",
         "win32ctypes.pywin32",
     ],